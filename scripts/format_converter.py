@@ -14,38 +14,117 @@ import yaml
 import os
 import sys
 import re
-from typing import Dict, Any, Set, Tuple
+import functools
+import itertools
+import hashlib
+import pathlib
+import pickle
+import tempfile
+from collections import ChainMap
+from dataclasses import dataclass
+from typing import Dict, Any, Mapping, Optional, Set, Tuple
+
+# Prefer the libyaml-backed loader, fall back to pure Python if unavailable
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@dataclass(frozen=True)
+class DepInfo:
+    """Dependency record: kind is 'git', 'path' or None; url holds the git URL or path"""
+    # Declared by hand, dataclass(slots=True) needs Python 3.10
+    __slots__ = ('kind', 'url', 'version', 'rev')
+    kind: Optional[str]
+    url: Optional[str]
+    version: Any
+    rev: Any
+
+
+# Matches a line starting a non-indented section, e.g. "plugins:"
+_TOP_LEVEL_KEY_RE = re.compile(r'[a-z_]+:')
+
+# Bumped whenever the pickled Bender.lock cache layout changes
+_LOCK_CACHE_FORMAT = 3
+
+# Directory owned by this tool for the Bender.lock caches
+_LOCK_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                               'bendis', 'format_converter')
+
+# Output directories already created by this process
+_created_dirs: Set[str] = set()
+
+# Matches URLs containing "github.com/pulp-platform" and captures the last
+# path segment as the repository name (same mapping as the Rust converter)
+_GH_PULP_RE = re.compile(r'(?=.*github\.com/pulp-platform)(?:.*/)?([^/]*)\Z', re.DOTALL)
 
 
 def load_lock_file(lock_path: str) -> Dict[str, Any]:
     """Load Bender.lock file"""
     with open(lock_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=Loader)
 
 
 def load_yml_file(yml_path: str) -> Dict[str, Any]:
     """Load YAML file"""
     with open(yml_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=Loader)
 
 
-def load_yml_file_as_text(yml_path: str) -> str:
-    """Load YAML file as raw text"""
+def load_yml_header(yml_path: str, max_chars: int = 8192) -> Dict[str, Any]:
+    """
+    Load only the leading part of a YAML file, enough to read 'dependencies'
+
+    Args:
+        yml_path: YAML file path
+        max_chars: Maximum number of characters to parse from the start of the file
+
+    Returns:
+        Parsed data; falls back to a full parse if the prefix is not sufficient
+    """
     with open(yml_path, 'r', encoding='utf-8') as f:
-        return f.read()
+        text = f.read(max_chars + 1)
+
+    # Whole file fits in the prefix, nothing to truncate
+    if len(text) <= max_chars:
+        return yaml.load(text, Loader=Loader)
+
+    # Cut at the last complete line
+    text = text[:text.rfind('\n') + 1]
+
+    try:
+        data = yaml.load(text, Loader=Loader)
+    except (KeyError, yaml.YAMLError):
+        return load_yml_file(yml_path)
+
+    # 'dependencies' is only complete if another top-level key follows it
+    if not isinstance(data, dict) or 'dependencies' not in data or list(data)[-1] == 'dependencies':
+        return load_yml_file(yml_path)
+
+    return data
 
 
 def convert_url(git_url: str) -> str:
     """Convert GitHub URL to IHEP internal Git URL"""
-    if 'github.com/pulp-platform' in git_url:
-        # Extract repository name
-        repo_name = git_url.split('/')[-1]
-        # Convert to IHEP internal URL
-        return f"git@code.ihep.ac.cn:heris/heris-platform/{repo_name}"
+    match = _GH_PULP_RE.match(git_url)
+    if match:
+        return f"git@code.ihep.ac.cn:heris/heris-platform/{match.group(1)}"
     return git_url
 
 
-def extract_dependencies_from_lock(lock_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+# typed=True so that e.g. version 1.0 and 1 are not folded together
+@functools.lru_cache(maxsize=None, typed=True)
+def _git_dep_info(git_url: str, version: Any, revision: Any) -> DepInfo:
+    """Build the DepInfo of a Git dependency, cached across lock files"""
+    # Convert URL
+    converted_url = convert_url(git_url)
+
+    # Keep version info if it exists and is not null
+    # Otherwise, use revision with 'rev' label
+    if version is not None:
+        return DepInfo('git', converted_url, version, None)
+    return DepInfo('git', converted_url, None, revision)
+
+
+def extract_dependencies_from_lock(lock_data: Dict[str, Any]) -> Dict[str, DepInfo]:
     """
     Extract dependency information from lock file
 
@@ -65,27 +144,62 @@ def extract_dependencies_from_lock(lock_data: Dict[str, Any]) -> Dict[str, Dict[
 
         # Process Git-type dependencies
         if 'Git' in source:
-            git_url = source['Git']
-            # Convert URL
-            converted_url = convert_url(git_url)
-
-            dep_info = {'git': converted_url}
-
-            # Add version info if it exists and is not null
-            # Otherwise, use revision with 'rev' label
-            if version is not None:
-                dep_info['version'] = version
-            elif revision is not None:
-                dep_info['rev'] = revision
-
-            dependencies[pkg_name] = dep_info
+            dependencies[pkg_name] = _git_dep_info(source['Git'], version, revision)
         elif 'Path' in source:
             # Process Path-type dependencies
-            dependencies[pkg_name] = {'path': source['Path']}
+            dependencies[pkg_name] = DepInfo('path', source['Path'], None, None)
 
     return dependencies
 
 
+def load_lock_dependencies(lock_path: str) -> Dict[str, DepInfo]:
+    """
+    Load dependencies from Bender.lock, reusing a pickled parse cache
+
+    The cache lives in the tool's own cache directory, keyed by the lock
+    file's absolute path, and is only used while the lock file's mtime and
+    size are unchanged. It holds the raw parsed lock data, so dependencies
+    are always extracted with the current conversion rules.
+
+    Args:
+        lock_path: Bender.lock file path
+
+    Returns:
+        Dependencies dictionary, see extract_dependencies_from_lock
+    """
+    path_hash = hashlib.sha256(os.path.abspath(lock_path).encode('utf-8')).hexdigest()
+    cache_path = os.path.join(_LOCK_CACHE_DIR, path_hash + '.pkl')
+    stat = os.stat(lock_path)
+
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_format, cached_mtime, cached_size, lock_data = pickle.load(f)
+        if (cached_format == _LOCK_CACHE_FORMAT
+                and cached_mtime == stat.st_mtime_ns and cached_size == stat.st_size):
+            return extract_dependencies_from_lock(lock_data)
+    except Exception:
+        # Missing, stale or unreadable cache, parse the lock file instead
+        pass
+
+    lock_data = load_lock_file(lock_path)
+
+    # Write to a temporary file first so a failed dump never leaves a broken cache
+    tmp_path = None
+    try:
+        os.makedirs(_LOCK_CACHE_DIR, mode=0o700, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=_LOCK_CACHE_DIR, delete=False) as f:
+            tmp_path = f.name
+            pickle.dump((_LOCK_CACHE_FORMAT, stat.st_mtime_ns, stat.st_size, lock_data), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pickle.PicklingError):
+        # Caching is best effort, e.g. on a read-only cache directory
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return extract_dependencies_from_lock(lock_data)
+
+
 def extract_dependencies_from_yml(yml_data: Dict[str, Any]) -> Set[str]:
     """
     Extract dependency names from Bender.yml
@@ -102,7 +216,18 @@ def extract_dependencies_from_yml(yml_data: Dict[str, Any]) -> Set[str]:
     return set()
 
 
-def extract_overrides_from_bender_yml(bender_yml_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+def dep_info_from_override(override: Any) -> DepInfo:
+    """Convert a single override entry from .bender.yml into a DepInfo"""
+    if not isinstance(override, dict):
+        return DepInfo(None, None, None, None)
+    if 'path' in override:
+        return DepInfo('path', override['path'], None, None)
+    if 'git' in override:
+        return DepInfo('git', override['git'], override.get('version'), override.get('rev'))
+    return DepInfo(None, None, None, None)
+
+
+def extract_overrides_from_bender_yml(bender_yml_data: Dict[str, Any]) -> Dict[str, DepInfo]:
     """
     Extract existing overrides from .bender.yml
 
@@ -114,63 +239,73 @@ def extract_overrides_from_bender_yml(bender_yml_data: Dict[str, Any]) -> Dict[s
     """
     overrides = bender_yml_data.get('overrides', {})
     if overrides:
-        return dict(overrides)
+        return {name: dep_info_from_override(info) for name, info in overrides.items()}
     return {}
 
 
-def compare_versions(version1: Any, version2: Any) -> int:
-    """
-    Compare two version numbers
+@functools.total_ordering
+class _VersionKey:
+    """Comparable parsed version, see version_key"""
+    __slots__ = ('parts',)
 
-    Args:
-        version1: First version (can be string, float, or None)
-        version2: Second version (can be string, float, or None)
+    def __init__(self, parts: Tuple[Tuple[Optional[int], str], ...]):
+        self.parts = parts
 
-    Returns:
-        1 if version1 > version2, -1 if version1 < version2, 0 if equal
-    """
-    # Handle None cases
-    if version1 is None and version2 is None:
+    def _compare(self, other: '_VersionKey') -> int:
+        # Missing trailing parts count as 0
+        for (n1, p1), (n2, p2) in itertools.zip_longest(self.parts, other.parts, fillvalue=(0, '0')):
+            if n1 is not None and n2 is not None:
+                if n1 != n2:
+                    return 1 if n1 > n2 else -1
+            elif p1 != p2:
+                # If not both numbers, compare as strings
+                return 1 if p1 > p2 else -1
         return 0
-    if version1 is None:
-        return -1
-    if version2 is None:
-        return 1
 
-    # Convert to string for comparison
-    v1_str = str(version1)
-    v2_str = str(version2)
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _VersionKey):
+            return NotImplemented
+        return self._compare(other) == 0
+
+    def __lt__(self, other: '_VersionKey') -> bool:
+        return self._compare(other) < 0
+
+    __hash__ = None
+
+
+@functools.lru_cache(maxsize=None, typed=True)
+def version_key(version: Any) -> _VersionKey:
+    """
+    Build a comparison key for a version number
+
+    Numeric parts compare as numbers, any other pair of parts compares as
+    strings, and missing trailing parts count as 0:
 
-    # Split by dots and compare
-    v1_parts = v1_str.split('.')
-    v2_parts = v2_str.split('.')
+    >>> version_key('1.2') == version_key('1.2.0')
+    True
+    >>> version_key('1.0.1') > version_key('1.0.0-rc.1')
+    True
+    >>> version_key('0.3.1') > version_key('0.3.0-alpha')
+    True
 
-    # Pad to same length
-    max_len = max(len(v1_parts), len(v2_parts))
-    v1_parts += ['0'] * (max_len - len(v1_parts))
-    v2_parts += ['0'] * (max_len - len(v2_parts))
+    Args:
+        version: Version (can be string, float or int)
 
-    for p1, p2 in zip(v1_parts, v2_parts):
+    Returns:
+        Key object supporting comparison operators
+    """
+    parts = []
+    for part in str(version).split('.'):
         try:
-            n1 = int(p1)
-            n2 = int(p2)
-            if n1 > n2:
-                return 1
-            elif n1 < n2:
-                return -1
+            parts.append((int(part), part))
         except ValueError:
-            # If not numbers, compare as strings
-            if p1 > p2:
-                return 1
-            elif p1 < p2:
-                return -1
-
-    return 0
+            parts.append((None, part))
+    return _VersionKey(tuple(parts))
 
 
-def find_missing_dependencies(lock_deps: Dict[str, Dict[str, Any]],
+def find_missing_dependencies(lock_deps: Dict[str, DepInfo],
                               yml_deps: Set[str],
-                              existing_overrides: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+                              existing_overrides: Dict[str, DepInfo]) -> Dict[str, DepInfo]:
     """
     Find dependencies that are in lock but not in yml, handling version conflicts
 
@@ -184,6 +319,10 @@ def find_missing_dependencies(lock_deps: Dict[str, Dict[str, Any]],
     """
     missing_deps = {}
 
+    # Nothing to do if Bender.yml already covers every locked dependency
+    if lock_deps.keys() <= yml_deps:
+        return missing_deps
+
     for dep_name, dep_info in lock_deps.items():
         # Skip if already in Bender.yml
         if dep_name in yml_deps:
@@ -194,15 +333,15 @@ def find_missing_dependencies(lock_deps: Dict[str, Dict[str, Any]],
             existing_info = existing_overrides[dep_name]
 
             # If both have git URLs, check versions/revisions
-            if 'git' in dep_info and 'git' in existing_info:
-                new_version = dep_info.get('version')
-                existing_version = existing_info.get('version')
-                new_rev = dep_info.get('rev')
-                existing_rev = existing_info.get('rev')
+            if dep_info.kind == 'git' and existing_info.kind == 'git':
+                new_version = dep_info.version
+                existing_version = existing_info.version
+                new_rev = dep_info.rev
+                existing_rev = existing_info.rev
 
                 # If both have versions, compare them
                 if new_version is not None and existing_version is not None:
-                    if compare_versions(new_version, existing_version) > 0:
+                    if version_key(new_version) > version_key(existing_version):
                         missing_deps[dep_name] = dep_info
                 # If new has version but existing has rev, prefer version
                 elif new_version is not None and existing_version is None:
@@ -214,7 +353,7 @@ def find_missing_dependencies(lock_deps: Dict[str, Dict[str, Any]],
                 # If new has rev but existing has version, keep existing (prefer version)
                 # Otherwise skip (same version/rev or older)
             # If one is path and one is git, prefer git (from lock)
-            elif 'git' in dep_info and 'path' in existing_info:
+            elif dep_info.kind == 'git' and existing_info.kind == 'path':
                 missing_deps[dep_name] = dep_info
         else:
             # Not in overrides, add it
@@ -223,50 +362,50 @@ def find_missing_dependencies(lock_deps: Dict[str, Dict[str, Any]],
     return missing_deps
 
 
-def format_dependency_line(name: str, dep_info: Dict[str, Any], max_name_len: int, max_url_len: int) -> str:
+def _render_url_part(dep_info: DepInfo) -> str:
+    """Render the leading '{ git: "..."' / '{ path: "..."' part of a dependency line"""
+    if dep_info.kind == 'path':
+        return '{ path: "' + str(dep_info.url) + '"'
+    elif dep_info.kind == 'git':
+        if dep_info.version is not None or dep_info.rev is not None:
+            return '{ git: "' + str(dep_info.url) + '",'
+        return '{ git: "' + str(dep_info.url) + '"'
+    return ''
+
+
+def format_dependency_line(name: str, dep_info: DepInfo, name_padding: str, url_part: str, url_padding: str) -> str:
     """
     Format a single dependency line in inline YAML style
 
     Args:
         name: Dependency name
         dep_info: Dependency information (git/path and version/rev)
-        max_name_len: Maximum name length for alignment
-        max_url_len: Maximum URL length for alignment
+        name_padding: Padding after the name for alignment
+        url_part: Pre-rendered URL part, see _render_url_part
+        url_padding: Padding after the URL part for alignment
 
     Returns:
         Formatted dependency line
     """
-    # Calculate padding for name alignment
-    name_padding = ' ' * (max_name_len - len(name))
-
-    if 'path' in dep_info:
-        # Path-type dependency
-        path = dep_info["path"]
-        url_padding = ' ' * (max_url_len - len(f'{{ path: "{path}"'))
-        return f'  {name}:{name_padding} {{ path: "{path}"{url_padding} }}'
-    elif 'git' in dep_info:
-        # Git-type dependency
-        git_url = dep_info['git']
-        git_part = f'{{ git: "{git_url}"'
-
-        if 'version' in dep_info:
-            version = dep_info['version']
-            git_part_with_comma = f'{git_part},'
-            url_padding = ' ' * (max_url_len - len(git_part_with_comma))
-            return f'  {name}:{name_padding} {git_part_with_comma}{url_padding} version: {version} }}'
-        elif 'rev' in dep_info:
-            rev = dep_info['rev']
-            git_part_with_comma = f'{git_part},'
-            url_padding = ' ' * (max_url_len - len(git_part_with_comma))
-            return f'  {name}:{name_padding} {git_part_with_comma}{url_padding} rev: "{rev}" }}'
-        else:
-            url_padding = ' ' * (max_url_len - len(git_part))
-            return f'  {name}:{name_padding} {git_part}{url_padding} }}'
+    # Collect line parts and join once at the end
+    parts = ['  ', name, ':', name_padding, ' ']
+
+    if dep_info.kind is None:
+        parts.append('{}')
+        return ''.join(parts)
+
+    parts += [url_part, url_padding]
+    if dep_info.kind == 'git' and dep_info.version is not None:
+        parts += [' version: ', str(dep_info.version), ' }']
+    elif dep_info.kind == 'git' and dep_info.rev is not None:
+        parts += [' rev: "', str(dep_info.rev), '" }']
+    else:
+        parts.append(' }')
 
-    return f'  {name}:{name_padding} {{}}'
+    return ''.join(parts)
 
 
-def generate_overrides_lines(all_overrides: Dict[str, Dict[str, Any]]) -> list:
+def generate_overrides_lines(all_overrides: Mapping[str, DepInfo]) -> str:
     """
     Generate formatted override lines
 
@@ -274,39 +413,39 @@ def generate_overrides_lines(all_overrides: Dict[str, Dict[str, Any]]) -> list:
         all_overrides: All overrides to format
 
     Returns:
-        List of formatted lines
+        Formatted lines joined by newlines, empty if there are no overrides
     """
     if not all_overrides:
-        return []
-
-    # Calculate maximum name length for alignment
-    max_name_len = max(len(name) for name in all_overrides.keys())
+        return ''
 
-    # Calculate maximum URL part length for alignment
+    # Calculate maximum name and URL part lengths for alignment in one pass
+    entries = []
+    max_name_len = 0
     max_url_len = 0
-    for dep_info in all_overrides.values():
-        if 'path' in dep_info:
-            url_part_len = len(f'{{ path: "{dep_info["path"]}"')
-        elif 'git' in dep_info:
-            git_url = dep_info['git']
-            if 'version' in dep_info or 'rev' in dep_info:
-                url_part_len = len(f'{{ git: "{git_url}",')
-            else:
-                url_part_len = len(f'{{ git: "{git_url}"')
-        else:
-            url_part_len = 0
-        max_url_len = max(max_url_len, url_part_len)
-
-    lines = []
     for name, dep_info in all_overrides.items():
-        lines.append(format_dependency_line(name, dep_info, max_name_len, max_url_len))
+        url_part = _render_url_part(dep_info)
+        max_name_len = max(max_name_len, len(name))
+        max_url_len = max(max_url_len, len(url_part))
+        entries.append((name, dep_info, url_part))
+
+    return '\n'.join([format_dependency_line(name, dep_info,
+                                             ' ' * (max_name_len - len(name)),
+                                             url_part,
+                                             ' ' * (max_url_len - len(url_part)))
+                      for name, dep_info, url_part in entries])
 
-    return lines
+
+def _append_section(text: str, section: str) -> str:
+    """Append a top-level section to YAML text, separated by a blank line"""
+    text = text.rstrip('\n')
+    if not text:
+        return section + '\n'
+    return text + '\n\n' + section + '\n'
 
 
 def update_bender_yml_overrides(bender_yml_text: str,
-                                existing_overrides: Dict[str, Dict[str, Any]],
-                                new_overrides: Dict[str, Dict[str, Any]]) -> str:
+                                existing_overrides: Dict[str, DepInfo],
+                                new_overrides: Dict[str, DepInfo]) -> str:
     """
     Update .bender.yml with new overrides
 
@@ -318,9 +457,8 @@ def update_bender_yml_overrides(bender_yml_text: str,
     Returns:
         Updated .bender.yml content
     """
-    # Merge overrides (new ones override existing ones with same name)
-    all_overrides = existing_overrides.copy()
-    all_overrides.update(new_overrides)
+    # Merged view of overrides (new ones override existing ones with same name)
+    all_overrides = ChainMap(new_overrides, existing_overrides)
 
     # Generate formatted override lines
     override_lines = generate_overrides_lines(all_overrides)
@@ -329,25 +467,38 @@ def update_bender_yml_overrides(bender_yml_text: str,
         return bender_yml_text
 
     # Build new overrides section
-    new_overrides_section = "overrides:\n" + '\n'.join(override_lines)
+    new_overrides_section = "overrides:\n" + override_lines
+
+    # No overrides section yet, append one without scanning the lines
+    if 'overrides:' not in bender_yml_text:
+        return _append_section(bender_yml_text, new_overrides_section)
 
-    # Replace overrides section in the original text
-    # Pattern matches from "overrides:" to the next non-indented section or EOF
-    pattern = r'overrides:.*?(?=\n[a-z_]+:|$)'
+    # Replace overrides section in the original text, line by line:
+    # from the "overrides:" line to the next non-indented section or EOF
+    lines = bender_yml_text.split('\n')
+    start = next((k for k, line in enumerate(lines) if line.startswith('overrides:')), None)
+    if start is None:
+        return _append_section(bender_yml_text, new_overrides_section)
 
-    updated_text = re.sub(pattern, new_overrides_section, bender_yml_text, flags=re.DOTALL)
+    end = next((k for k in range(start + 1, len(lines)) if _TOP_LEVEL_KEY_RE.match(lines[k])), len(lines))
+    if end == len(lines) and lines[-1] == '':
+        # Keep the trailing newline at EOF
+        end -= 1
 
-    return updated_text
+    lines[start:end] = [new_overrides_section]
+
+    return '\n'.join(lines)
 
 
 def save_file(content: str, output_path: str):
     """Save file"""
-    # Ensure output directory exists
+    # Ensure output directory exists, once per directory
     output_dir = os.path.dirname(output_path)
-    os.makedirs(output_dir, exist_ok=True)
+    if output_dir and output_dir not in _created_dirs:
+        os.makedirs(output_dir, exist_ok=True)
+        _created_dirs.add(output_dir)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    pathlib.Path(output_path).write_text(content, encoding='utf-8')
 
 
 def process_bender_files(timestamp: str, input_base: str = "input/filepack", output_base: str = "output/filepackout"):
@@ -378,14 +529,15 @@ def process_bender_files(timestamp: str, input_base: str = "input/filepack", out
     print(f"Reading file: {bender_yml_path}")
 
     # Load files
-    lock_data = load_lock_file(lock_path)
-    yml_data = load_yml_file(yml_path)
-    bender_yml_data = load_yml_file(bender_yml_path)
-    bender_yml_text = load_yml_file_as_text(bender_yml_path)
+    yml_data = load_yml_header(yml_path)
+    # Read .bender.yml once, then parse the text
+    with open(bender_yml_path, 'r', encoding='utf-8') as f:
+        bender_yml_text = f.read()
+    bender_yml_data = yaml.load(bender_yml_text, Loader=Loader)
 
     # Extract dependencies
     print("Extracting dependencies from Bender.lock...")
-    lock_deps = extract_dependencies_from_lock(lock_data)
+    lock_deps = load_lock_dependencies(lock_path)
 
     print("Extracting dependencies from Bender.yml...")
     yml_deps = extract_dependencies_from_yml(yml_data)